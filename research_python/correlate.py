@@ -1,12 +1,16 @@
-import json
+import os
 import numpy as np
-from src.graph_utils import build_vc_graph, get_laplacian_spectrum
+from src.graph_utils import build_vc_adjacency, get_laplacian_spectrum
+from src.dataset_io import load_dataset
 
-def run_experiment(dataset_path="data/dataset_small.json"):
+def run_experiment(dataset_path=None):
+    if dataset_path is None:
+        dataset_path = "data/dataset_small.npz"
+        if not os.path.exists(dataset_path):
+            dataset_path = "data/dataset_small.json" # legacy format
     print(f"Loading dataset from {dataset_path}...")
     try:
-        with open(dataset_path, "r") as f:
-            data = json.load(f)
+        data = load_dataset(dataset_path)
     except FileNotFoundError:
         print("Dataset not found. Run generate_data.py first.")
         return
@@ -26,11 +30,11 @@ def run_experiment(dataset_path="data/dataset_small.json"):
         clauses = sample['clauses']
         rigidity = sample['rigidity']
         
-        # Build Graph
-        G = build_vc_graph(clauses, n_vars)
-        
+        # Build Graph (sparse adjacency, no NetworkX overhead)
+        adjacency = build_vc_adjacency(clauses, n_vars)
+
         # Get Spectrum
-        evals = get_laplacian_spectrum(G, num_eigenvalues=3)
+        evals = get_laplacian_spectrum(adjacency, num_eigenvalues=3)
         
         if not evals:
             continue
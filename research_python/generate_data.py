@@ -1,60 +1,82 @@
-import json
 import time
 import os
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from src.sat_generator import SatGenerator
 from src.backbone_finder import BackboneFinder
+from src.dataset_io import save_dataset
 
-def generate_dataset(num_samples=50, n_vars=50, alpha=4.26, output_file="data/golden_dataset.json"):
+def _make_one_sample(args):
+    """
+    Generates and labels a single sample (runs in a worker process).
+    Returns a sample dict (without 'id'), or None if the instance was UNSAT.
+    Must stay at module scope so it is picklable for the process pool.
+    """
+    seed, n_vars, alpha = args
+    random.seed(seed)
+    np.random.seed(seed % (2**32))
+
+    clauses, _ = SatGenerator.generate_3sat(n_vars, alpha)
+
+    # Solve & Find Backbone
+    # This is the "Expensive" Step (Labeling)
+    backbone, satisfiable = BackboneFinder().find_backbone(clauses, n_vars)
+
+    if not satisfiable:
+        # We skip UNSAT instances for now.
+        # For Backbone prediction, we usually care about SAT instances.
+        return None
+
+    rigidity = len(backbone) / n_vars
+    return {
+        "n_vars": n_vars,
+        "alpha": alpha,
+        "clauses": clauses,
+        "backbone": backbone,
+        "backbone_size": len(backbone),
+        "rigidity": rigidity
+    }
+
+def generate_dataset(num_samples=50, n_vars=50, alpha=4.26, output_file="data/golden_dataset.npz", max_workers=None):
     print(f"Generating Golden Dataset ({num_samples} samples, N={n_vars})...")
-    
+
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    
-    finder = BackboneFinder()
+
+    workers = max_workers or os.cpu_count() or 1
     dataset = []
-    
+
     start_global = time.time()
-    
-    count = 0
+
+    base_seed = time.time_ns() % (2**31)
     attempts = 0
-    
-    while count < num_samples:
-        attempts += 1
-        clauses, _ = SatGenerator.generate_3sat(n_vars, alpha)
-        
-        # Solve & Find Backbone
-        # This is the "Expensive" Step (Labeling)
-        backbone, satisfiable = finder.find_backbone(clauses, n_vars)
-        
-        if not satisfiable:
-            # We skip UNSAT instances for now, or maybe keep them labeled as UNSAT?
-            # For Backbone prediction, we usually care about SAT instances.
-            # Let's keep a few UNSAT if needed, but for now focus on SAT.
-            print(f"Attempt {attempts}: UNSAT (Skipping)")
-            continue
-            
-        # Calculate Rigidity
-        rigidity = len(backbone) / n_vars
-        
-        sample = {
-            "id": count,
-            "n_vars": n_vars,
-            "alpha": alpha,
-            "clauses": clauses,
-            "backbone": backbone,
-            "backbone_size": len(backbone),
-            "rigidity": rigidity
-        }
-        dataset.append(sample)
-        count += 1
-        print(f"Generated Sample {count}/{num_samples} (Rigidity: {rigidity:.2f})")
-        
+
+    # Labeling is embarrassingly parallel: fan the per-sample work out
+    # across cores. Each wave over-submits ~1.5x the remaining target so
+    # UNSAT rejections don't leave workers idle at the tail.
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while len(dataset) < num_samples:
+            remaining = num_samples - len(dataset)
+            wave = max(workers, int(remaining * 1.5))
+            seeds = [(base_seed + attempts + i, n_vars, alpha) for i in range(wave)]
+            attempts += wave
+
+            for sample in executor.map(_make_one_sample, seeds, chunksize=4):
+                if sample is None:
+                    print("Attempt: UNSAT (Skipping)")
+                    continue
+                if len(dataset) >= num_samples:
+                    break
+                sample["id"] = len(dataset)
+                dataset.append(sample)
+                print(f"Generated Sample {len(dataset)}/{num_samples} (Rigidity: {sample['rigidity']:.2f})")
+
     duration = time.time() - start_global
-    print(f"Done! Saved {count} samples to {output_file}")
+    print(f"Done! Saved {len(dataset)} samples to {output_file}")
     print(f"Total time: {duration:.2f}s")
-    
-    with open(output_file, "w") as f:
-        json.dump(dataset, f, indent=2)
+
+    save_dataset(dataset, output_file)
 
 if __name__ == "__main__":
     # Generate a small batch for testing first
-    generate_dataset(num_samples=10, n_vars=40, output_file="data/dataset_small.json")
+    generate_dataset(num_samples=10, n_vars=40, output_file="data/dataset_small.npz")
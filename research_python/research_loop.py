@@ -1,10 +1,10 @@
 import torch
-import time
+from concurrent.futures import ThreadPoolExecutor
 from src.sat_generator import SatGenerator
 from src.backbone_finder import BackboneFinder
-from src.gnn_model import BackboneMPNN
+from src.gnn_model import BackboneMPNN, maybe_compile
 from generate_data import generate_dataset
-from train_gnn import train, load_data
+from train_gnn import train, load_data, collate
 import torch.optim as optim
 import torch.nn as nn
 import os
@@ -21,57 +21,81 @@ def automated_search_loop():
     
     # Initialize Model once (or reset every time? Let's keep learning)
     model = BackboneMPNN(hidden_dim=64, num_layers=6).to(device)
+    run_model = maybe_compile(model) # fused kernels; shares model's parameters
     optimizer = optim.Adam(model.parameters(), lr=0.001)
-    criterion = nn.BCELoss()
+    # Logits + BCEWithLogitsLoss instead of sigmoid + BCELoss: numerically
+    # safe under reduced precision (BCELoss is disallowed in autocast).
+    criterion = nn.BCEWithLogitsLoss()
+
+    # Mixed precision on the GPU path: bf16 keeps fp32's exponent range,
+    # so no grad scaler is needed. Master weights stay fp32. CPU runs fp32.
+    use_bf16 = device.type == 'cuda' and torch.cuda.is_bf16_supported()
+    if use_bf16:
+        print("Mixed precision: bf16 autocast enabled")
     
+    # Generation parameters (Curriculum Learning)
+    # We slowly increase N if we get good at small N?
+    # For now, keep N=40 to find a breakthrough there first.
+    n_vars = 40
+    num_samples = 50
+
+    # Labeling runs on the CPU, training on the (possibly GPU) device.
+    # A single background thread generates the NEXT cycle's dataset while
+    # we train on the current one, so the two stages overlap instead of
+    # alternating. The generator itself fans out over a process pool, so
+    # the GIL is not a bottleneck here.
+    prefetcher = ThreadPoolExecutor(max_workers=1)
+    pending = prefetcher.submit(generate_dataset, num_samples=num_samples,
+                                n_vars=n_vars, output_file="data/cycle_1.npz")
+
     while True:
         cycle += 1
         print(f"\n=== CYCLE {cycle} ===")
-        
-        # 1. Generate Fresh Data (Curriculum Learning)
-        # We slowly increase N if we get good at small N?
-        # For now, keep N=40 to find a breakthrough there first.
-        n_vars = 40
-        num_samples = 50 
-        dataset_file = f"data/cycle_{cycle}.json"
-        
-        print(f"[1/3] Generating {num_samples} hard instances (N={n_vars})...")
-        generate_dataset(num_samples=num_samples, n_vars=n_vars, output_file=dataset_file)
-        
+
+        # 1. Collect Fresh Data (generated in the background)
+        dataset_file = f"data/cycle_{cycle}.npz"
+
+        print(f"[1/3] Waiting for {num_samples} hard instances (N={n_vars})...")
+        pending.result()
+
+        # Immediately start generating the next cycle's data
+        pending = prefetcher.submit(generate_dataset, num_samples=num_samples,
+                                    n_vars=n_vars, output_file=f"data/cycle_{cycle + 1}.npz")
+
         # 2. Train
         print(f"[2/3] Training GNN on Cycle {cycle} data...")
         # Custom short training loop
-        data = load_data(dataset_file, device)
+        data = load_data(dataset_file)
         split = int(0.8 * len(data))
         train_set = data[:split]
         val_set = data[split:]
-        
+
+        # One block-diagonal batch per split: each epoch is a single
+        # forward/backward over the whole cycle's data.
+        n_v, n_c, v_t, c_t, s_t, labels = collate(train_set, device)
+        val_n_v, val_n_c, val_v, val_c, val_s, val_labels = collate(val_set, device)
+
         epochs = 10
         for epoch in range(epochs):
             model.train()
-            total_loss = 0
-            for n_v, clauses, labels in train_set:
-                optimizer.zero_grad()
-                preds = model(n_v, clauses, device)
-                loss = criterion(preds, labels)
-                loss.backward()
-                optimizer.step()
-                total_loss += loss.item()
-        
+            optimizer.zero_grad()
+            with torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=use_bf16):
+                logits = run_model(n_v, n_c, v_t, c_t, s_t, return_logits=True)
+                loss = criterion(logits, labels)
+            loss.backward()
+            optimizer.step()
+
         # 3. Validation & Breakthrough Check
         print(f"[3/3] Validating...")
         model.eval()
-        total_acc = 0
-        total_nodes = 0
-        
+
         with torch.no_grad():
-            for n_v, clauses, labels in val_set:
-                preds = model(n_v, clauses, device)
-                binary_preds = (preds > 0.5).float()
-                correct = (binary_preds == labels).sum().item()
-                total_acc += correct
-                total_nodes += n_v
-        
+            with torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=use_bf16):
+                logits = run_model(val_n_v, val_n_c, val_v, val_c, val_s, return_logits=True)
+            binary_preds = (logits > 0).float() # logit > 0 <=> prob > 0.5
+            total_acc = (binary_preds == val_labels).sum().item()
+            total_nodes = val_n_v
+
         accuracy = (total_acc / total_nodes) * 100 if total_nodes > 0 else 0
         print(f"Cycle {cycle} Validation Accuracy: {accuracy:.2f}%")
         
@@ -85,13 +109,14 @@ def automated_search_loop():
             print("!!! BREAKTHROUGH DETECTED: ACCURACY > 95% !!!")
             print("!!! POTENTIAL P=NP SOLUTION FOUND. STOPPING LOOP. !!!")
             print("!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
+            pending.cancel()
+            prefetcher.shutdown(wait=False)
             break
-            
+
         # Cleanup data file to save space?
         # os.remove(dataset_file)
-        
+
         print("Continuing search...")
-        time.sleep(1)
 
 if __name__ == "__main__":
     try:
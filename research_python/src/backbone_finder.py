@@ -10,7 +10,7 @@ class BackboneFinder:
 
     def find_backbone(self, clauses, n_vars):
         """
-        Returns: 
+        Returns:
            backbone: dict {var_idx: value} (Only frozen vars)
            is_satisfiable: bool
         """
@@ -19,34 +19,35 @@ class BackboneFinder:
         if not satisfiable:
             return {}, False
 
-        # 2. Check each variable in the solution
-        backbone = {}
-        
-        # Optimization: We only need to check vars that are assigned in the first solution.
+        # 2. Check each variable in the solution.
+        # Compile the base formula ONCE; each flip test is just an
+        # assumption-based solve on the shared compiled state instead of
+        # rebuilding and re-solving the whole formula from scratch.
+        state = DpllSolver._compile(clauses, n_vars)
+
+        # Candidates: only vars assigned in the first solution.
         # Unassigned vars (free) are obviously not frozen, or dont matter.
-        # Actually in DPLL partial assignment might be returned if typically adequate? 
-        # Our DPLL returns full assignment usually? Let's assume full.
-        
-        for var in range(1, n_vars + 1):
-            if var not in first_assignment:
-                # If var is not in assignment, it logicall implies it was free (don't care)
-                # So not frozen.
-                continue
-                
-            val = first_assignment[var]
-            
+        candidates = dict(first_assignment)
+        backbone = {}
+
+        while candidates:
+            var, val = candidates.popitem()
+
             # Try to refute the backbone property:
             # Can we find a solution where var = !val?
-            
-            # We force var = !val by adding a unit clause
             negated_unit = -var if val else var
-            test_clauses = clauses + [[negated_unit]]
-            
-            # We reuse solver? Or new instance? Solver is stateless basically.
-            is_flippable, _ = self.solver.solve(test_clauses, n_vars)
-            
+            is_flippable, model = self.solver.solve_with_assumptions(state, [negated_unit])
+
             if not is_flippable:
                 # Could not flip logic -> It is frozen!
                 backbone[var] = val
-        
+            else:
+                # Model filtering: every remaining candidate that the new
+                # model assigns differently (or leaves free) has now been
+                # seen with both values, so it cannot be frozen. This
+                # prunes most candidates after the first few solves.
+                for v in list(candidates):
+                    if v not in model or model[v] != candidates[v]:
+                        del candidates[v]
+
         return backbone, True
@@ -0,0 +1,100 @@
+import json
+import numpy as np
+
+"""
+Columnar dataset storage.
+
+Datasets used to be pretty-printed JSON, which costs minutes of text
+encoding/parsing once sample counts grow. The .npz layout below stores
+every field as one flat numpy column with offset arrays, so saving and
+loading are a handful of bulk array writes/reads:
+
+    ids, n_vars, alpha, rigidity      [S]      per-sample scalars
+    lits                              [L]      all literals, sample-major
+    clause_ptr                        [C + 1]  literal offsets per clause
+    sample_ptr                        [S + 1]  clause offsets per sample
+    backbone_vars / backbone_vals     [B]      flat backbone entries
+    backbone_ptr                      [S + 1]  backbone offsets per sample
+
+.json files are still read/written for backward compatibility (the
+format is chosen by file extension).
+"""
+
+def save_dataset(samples, path):
+    """
+    Saves a list of sample dicts (as built by generate_data) to `path`.
+    '.json' extension keeps the legacy format; anything else is columnar .npz.
+    """
+    if path.endswith('.json'):
+        with open(path, 'w') as f:
+            json.dump(samples, f)
+        return
+
+    ids = np.array([s['id'] for s in samples], dtype=np.int64)
+    n_vars = np.array([s['n_vars'] for s in samples], dtype=np.int64)
+    alpha = np.array([s['alpha'] for s in samples], dtype=np.float64)
+    rigidity = np.array([s['rigidity'] for s in samples], dtype=np.float64)
+
+    lits = []
+    clause_ptr = [0]
+    sample_ptr = [0]
+    backbone_vars = []
+    backbone_vals = []
+    backbone_ptr = [0]
+    for s in samples:
+        for clause in s['clauses']:
+            lits.extend(clause)
+            clause_ptr.append(len(lits))
+        sample_ptr.append(len(clause_ptr) - 1)
+        for var, val in s['backbone'].items():
+            backbone_vars.append(int(var))
+            backbone_vals.append(1 if val else 0)
+        backbone_ptr.append(len(backbone_vars))
+
+    np.savez(path,
+             ids=ids, n_vars=n_vars, alpha=alpha, rigidity=rigidity,
+             lits=np.array(lits, dtype=np.int32),
+             clause_ptr=np.array(clause_ptr, dtype=np.int64),
+             sample_ptr=np.array(sample_ptr, dtype=np.int64),
+             backbone_vars=np.array(backbone_vars, dtype=np.int32),
+             backbone_vals=np.array(backbone_vals, dtype=np.uint8),
+             backbone_ptr=np.array(backbone_ptr, dtype=np.int64))
+
+def load_dataset(path):
+    """
+    Loads a dataset saved by save_dataset (either format).
+    Returns: list of sample dicts in the shape the JSON files used
+    (backbone keys are strings, matching a JSON round-trip).
+    """
+    if path.endswith('.json'):
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    with np.load(path) as z:
+        ids = z['ids']
+        n_vars = z['n_vars']
+        alpha = z['alpha']
+        rigidity = z['rigidity']
+        lits = z['lits']
+        clause_ptr = z['clause_ptr']
+        sample_ptr = z['sample_ptr']
+        backbone_vars = z['backbone_vars']
+        backbone_vals = z['backbone_vals']
+        backbone_ptr = z['backbone_ptr']
+
+    samples = []
+    for i in range(len(ids)):
+        clauses = [lits[clause_ptr[c]:clause_ptr[c + 1]].tolist()
+                   for c in range(sample_ptr[i], sample_ptr[i + 1])]
+        backbone = {str(backbone_vars[b]): bool(backbone_vals[b])
+                    for b in range(backbone_ptr[i], backbone_ptr[i + 1])}
+        samples.append({
+            'id': int(ids[i]),
+            'n_vars': int(n_vars[i]),
+            'alpha': float(alpha[i]),
+            'clauses': clauses,
+            'backbone': backbone,
+            'backbone_size': len(backbone),
+            'rigidity': float(rigidity[i]),
+        })
+    return samples
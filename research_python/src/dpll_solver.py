@@ -1,13 +1,41 @@
 import sys
-from collections import Counter
+import numpy as np
 
 # Increase recursion depth for deep DPLL searches
 sys.setrecursionlimit(50000)
 
+# Clauses are encoded as bitsets over variable indices:
+# bit i of word (i // 64) corresponds to variable i+1.
+_WORD_BITS = 64
+
+# Numba is optional: with it the whole search runs as one compiled
+# kernel, without it we fall back to the vectorized numpy implementation.
+try:
+    from numba import njit
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+if hasattr(np, "bitwise_count"):
+    # numpy >= 2.0 has a vectorized popcount
+    def _row_popcount(words):
+        return np.bitwise_count(words).sum(axis=1)
+else:
+    _POP_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+    def _row_popcount(words):
+        return _POP_TABLE[words.view(np.uint8)].reshape(words.shape[0], -1).sum(axis=1)
+
+
 class DpllSolver:
     """
     Deterministic Exact Solver using DPLL algorithm.
     Used for establishing Ground Truth (finding the actual Backbone).
+
+    Internally each clause is a pair of bitmasks (positive literals,
+    negative literals) stored as rows of uint64 words, so simplification
+    and unit/conflict detection are branchless integer ops instead of
+    Python list rebuilding.
     """
     def __init__(self):
         self.steps = 0
@@ -22,80 +50,415 @@ class DpllSolver:
         self.backtracks = 0
         # Check for empty formula first
         if not clauses: return True, {}
-        
-        # Unit Prop before starting
-        return self._dpll(clauses, {})
 
-    def _dpll(self, clauses, assignment):
-        self.steps += 1
-        
-        # 1. Base Cases
-        if not clauses: 
-            return True, assignment
-        for c in clauses:
-            if not c: 
+        return self.solve_with_assumptions(self._compile(clauses, n_vars), [])
+
+    def solve_with_assumptions(self, state, assumptions):
+        """
+        Solves a pre-compiled formula under extra unit assumptions.
+
+        Args:
+            state: compiled formula from _compile. Not modified, so the
+                same compiled formula can be reused across solves.
+            assumptions: iterable of literals forced true before branching.
+
+        Returns: (satisfiable: bool, assignment: dict)
+        """
+        self.steps = 0
+        self.backtracks = 0
+
+        pos, neg, occ_indptr, occ_indices = state
+        if pos.shape[0] == 0: return True, {}
+
+        if _NUMBA_AVAILABLE:
+            assumptions_arr = np.asarray(list(assumptions), dtype=np.int64)
+            sat, assign, steps, backtracks = _nb_search(pos, neg, occ_indptr,
+                                                        occ_indices, assumptions_arr)
+            self.steps = int(steps)
+            self.backtracks = int(backtracks)
+            if not sat:
                 return False, None
-            
-        # 2. Unit Propagation
+            # Plain Python bools (np.bool_ is not JSON serializable downstream)
+            assignment = {v + 1: bool(assign[v])
+                          for v in range(assign.shape[0]) if assign[v] != -1}
+            return True, assignment
+
+        active = pos | neg
+        satisfied = np.zeros(pos.shape[0], dtype=bool)
+        assignment = {}
+        for lit in assumptions:
+            assignment[abs(lit)] = (lit > 0)
+            self._assign(pos, neg, active, satisfied, lit)
+        return self._dpll(pos, neg, active, satisfied, assignment)
+
+    @staticmethod
+    def _compile(clauses, n_vars):
+        """
+        Encodes clauses as uint64 bitmask arrays plus occurrence lists.
+        Returns: (pos, neg, occ_indptr, occ_indices) where pos/neg have
+        shape [num_clauses, num_words] (bit i of word w marks variable
+        w*64 + i + 1) and occ_* index clauses by contained literal.
+        """
+        # A clause holding a complementary pair (v OR NOT v) is true under
+        # every assignment, and the one-bit-per-variable encoding cannot
+        # represent it (the pair would collapse to a single active bit and
+        # read as a unit clause). Dropping it preserves equivalence.
+        kept = []
+        for clause in clauses:
+            lits = set(clause)
+            if any(-lit in lits for lit in lits):
+                continue
+            kept.append(clause)
+        clauses = kept
+
+        n_words = (n_vars + _WORD_BITS - 1) // _WORD_BITS
+        pos = np.zeros((len(clauses), n_words), dtype=np.uint64)
+        neg = np.zeros((len(clauses), n_words), dtype=np.uint64)
+
+        for c_idx, clause in enumerate(clauses):
+            for lit in clause:
+                var = abs(lit) - 1
+                word, bit = divmod(var, _WORD_BITS)
+                mask = np.uint64(1) << np.uint64(bit)
+                if lit > 0:
+                    pos[c_idx, word] |= mask
+                else:
+                    neg[c_idx, word] |= mask
+
+        # Literal -> clause occurrence lists in CSR form, so propagation
+        # touches only the clauses that actually contain the assigned
+        # variable. Key = 2*var_index + polarity (0 positive, 1 negative).
+        n_keys = 2 * n_words * _WORD_BITS
+        counts = np.zeros(n_keys, dtype=np.int64)
+        for clause in clauses:
+            for lit in clause:
+                counts[2 * (abs(lit) - 1) + (0 if lit > 0 else 1)] += 1
+
+        occ_indptr = np.zeros(n_keys + 1, dtype=np.int64)
+        np.cumsum(counts, out=occ_indptr[1:])
+        occ_indices = np.empty(occ_indptr[-1], dtype=np.int64)
+        fill = occ_indptr[:-1].copy()
+        for c_idx, clause in enumerate(clauses):
+            for lit in clause:
+                key = 2 * (abs(lit) - 1) + (0 if lit > 0 else 1)
+                occ_indices[fill[key]] = c_idx
+                fill[key] += 1
+
+        return pos, neg, occ_indptr, occ_indices
+
+    @staticmethod
+    def _assign(pos, neg, active, satisfied, literal):
+        """
+        Propagates a single literal in-place:
+        clauses containing 'literal' become satisfied, the variable's bit
+        is cleared from every active mask (removing '-literal' occurrences).
+        """
+        var = abs(literal) - 1
+        word, bit = divmod(var, _WORD_BITS)
+        mask = np.uint64(1) << np.uint64(bit)
+
+        hits = pos[:, word] if literal > 0 else neg[:, word]
+        satisfied |= (hits & mask) != 0
+        active[:, word] &= ~mask
+
+    def _dpll(self, pos, neg, active, satisfied, assignment):
+        self.steps += 1
+
+        # 1. Unit Propagation (with base-case checks folded in)
         while True:
-            unit_lit = None
-            for c in clauses:
-                if len(c) == 1:
-                    unit_lit = c[0]
-                    break
-            
-            if unit_lit is None:
+            if satisfied.all():
+                return True, assignment
+
+            open_clauses = ~satisfied
+            counts = _row_popcount(active)
+
+            if np.any(open_clauses & (counts == 0)):
+                return False, None # Conflict (empty clause)
+
+            units = np.flatnonzero(open_clauses & (counts == 1))
+            if units.size == 0:
                 break
-                
-            # Propagate
+
+            # Propagate one unit; re-scan picks up cascades and conflicts
+            unit_lit = self._extract_literal(pos, active, units[0])
             assignment[abs(unit_lit)] = (unit_lit > 0)
-            clauses = self._simplify(clauses, unit_lit)
-            
-            if not clauses: return True, assignment
-            for c in clauses:
-                if not c: return False, None # Conflict
-
-        # 3. Splitting Heuristic (DLIS - Dynamic Largest Individual Sum)
-        # Find literal that appears most frequently
-        counter = Counter()
-        for c in clauses:
-            for lit in c:
-                counter[lit] += 1
-        
-        if not counter:
-             # Should be covered by base cases, but safety first
-             return True, assignment
-
-        best_lit, _ = counter.most_common(1)[0]
-        
+            self._assign(pos, neg, active, satisfied, unit_lit)
+
+        # 2. Splitting Heuristic (DLIS - Dynamic Largest Individual Sum)
+        # Count active literal occurrences over unsatisfied clauses only.
+        open_active = active[open_clauses]
+        pos_counts = _bit_column_sums(open_active & pos[open_clauses])
+        neg_counts = _bit_column_sums(open_active & neg[open_clauses])
+
+        best_pos = int(pos_counts.argmax())
+        best_neg = int(neg_counts.argmax())
+        if pos_counts[best_pos] >= neg_counts[best_neg]:
+            best_lit = best_pos + 1
+        else:
+            best_lit = -(best_neg + 1)
+
         # Branch 1: Try best_lit
+        new_active = active.copy()
+        new_satisfied = satisfied.copy()
         new_assign = assignment.copy()
         new_assign[abs(best_lit)] = (best_lit > 0)
-        
-        res, final_assign = self._dpll(self._simplify(clauses, best_lit), new_assign)
+        self._assign(pos, neg, new_active, new_satisfied, best_lit)
+
+        res, final_assign = self._dpll(pos, neg, new_active, new_satisfied, new_assign)
         if res: return True, final_assign
-        
+
         self.backtracks += 1
-        
-        # Branch 2: Try -best_lit
-        new_assign = assignment.copy()
-        new_assign[abs(best_lit)] = (best_lit < 0) # Negate value
-        
-        return self._dpll(self._simplify(clauses, -best_lit), new_assign)
 
-    def _simplify(self, clauses, literal):
+        # Branch 2: Try -best_lit (we own this state, so mutate in-place)
+        assignment[abs(best_lit)] = (best_lit < 0) # Negate value
+        self._assign(pos, neg, active, satisfied, -best_lit)
+
+        return self._dpll(pos, neg, active, satisfied, assignment)
+
+    @staticmethod
+    def _extract_literal(pos, active, c_idx):
+        """
+        Returns the (signed) literal of the lowest active bit in clause c_idx.
+        """
+        for word in range(active.shape[1]):
+            bits = int(active[c_idx, word])
+            if bits:
+                bit = (bits & -bits).bit_length() - 1
+                var = word * _WORD_BITS + bit + 1
+                if int(pos[c_idx, word]) >> bit & 1:
+                    return var
+                return -var
+        raise ValueError("clause has no active literals")
+
+
+def _bit_column_sums(words):
+    """
+    Per-bit occurrence counts across clause rows: bit i of word w maps to
+    index w*64 + i in the returned array.
+    """
+    if words.shape[0] == 0:
+        return np.zeros(words.shape[1] * _WORD_BITS, dtype=np.int64)
+    as_bytes = np.ascontiguousarray(words).view(np.uint8)
+    bits = np.unpackbits(as_bytes, bitorder='little').reshape(words.shape[0], -1)
+    return bits.sum(axis=0)
+
+
+# --- Numba kernels ---------------------------------------------------------
+# Same algorithm as the numpy path above (unit propagation + DLIS + two-way
+# branching on bitmask clauses), but as one compiled iterative search with
+# an explicit decision stack, so no Python object overhead per propagation.
+
+if _NUMBA_AVAILABLE:
+    _ONE = np.uint64(1)
+    _ZERO = np.uint64(0)
+
+    @njit(cache=True)
+    def _nb_clause_count(active, c):
+        """Number of active literals in clause c, capped at 2 (early exit)."""
+        cnt = 0
+        for w in range(active.shape[1]):
+            x = active[c, w]
+            while x != _ZERO:
+                x &= x - _ONE
+                cnt += 1
+                if cnt > 1:
+                    return cnt
+        return cnt
+
+    @njit(cache=True)
+    def _nb_clause_literal(pos, active, c):
+        """The (signed) literal of the lowest active bit in clause c, 0 if empty."""
+        for w in range(active.shape[1]):
+            x = active[c, w]
+            if x != _ZERO:
+                b = 0
+                while ((x >> np.uint64(b)) & _ONE) == _ZERO:
+                    b += 1
+                var = w * _WORD_BITS + b + 1
+                if (pos[c, w] & (_ONE << np.uint64(b))) != _ZERO:
+                    return var
+                return -var
+        return 0
+
+    @njit(cache=True)
+    def _nb_assign(pos, neg, active, satisfied, assign, occ_indptr, occ_indices,
+                   lit, units, tail, n_sat):
+        """
+        Propagates one literal via the occurrence lists: only clauses that
+        actually contain the variable are touched (instead of scanning all
+        clauses). Newly-unit clause indices are appended to units[tail:].
+        Returns: (tail, n_sat, conflict)
+        """
+        v = (lit if lit > 0 else -lit) - 1
+        w = v // _WORD_BITS
+        mask = _ONE << np.uint64(v % _WORD_BITS)
+        assign[v] = 1 if lit > 0 else 0
+
+        sat_key = 2 * v + (0 if lit > 0 else 1)
+        shrink_key = 2 * v + (1 if lit > 0 else 0)
+
+        for i in range(occ_indptr[sat_key], occ_indptr[sat_key + 1]):
+            c = occ_indices[i]
+            if not satisfied[c]:
+                satisfied[c] = True
+                n_sat += 1
+
+        conflict = False
+        for i in range(occ_indptr[shrink_key], occ_indptr[shrink_key + 1]):
+            c = occ_indices[i]
+            active[c, w] &= ~mask
+            if satisfied[c]:
+                continue
+            cnt = _nb_clause_count(active, c)
+            if cnt == 0:
+                conflict = True
+            elif cnt == 1:
+                units[tail] = c
+                tail += 1
+
+        return tail, n_sat, conflict
+
+    @njit(cache=True)
+    def _nb_choose(pos, neg, active, satisfied, n_vars):
+        """DLIS: most frequent active literal over unsatisfied clauses."""
+        pos_cnt = np.zeros(n_vars, np.int64)
+        neg_cnt = np.zeros(n_vars, np.int64)
+        n_clauses, n_words = active.shape
+        for c in range(n_clauses):
+            if satisfied[c]:
+                continue
+            for w in range(n_words):
+                x = active[c, w]
+                while x != _ZERO:
+                    low = x & (~x + _ONE)
+                    b = 0
+                    while ((low >> np.uint64(b)) & _ONE) == _ZERO:
+                        b += 1
+                    v = w * _WORD_BITS + b
+                    if (pos[c, w] & low) != _ZERO:
+                        pos_cnt[v] += 1
+                    else:
+                        neg_cnt[v] += 1
+                    x ^= low
+        best_pos = 0
+        best_neg = 0
+        for v in range(n_vars):
+            if pos_cnt[v] > pos_cnt[best_pos]:
+                best_pos = v
+            if neg_cnt[v] > neg_cnt[best_neg]:
+                best_neg = v
+        if pos_cnt[best_pos] >= neg_cnt[best_neg]:
+            return best_pos + 1
+        return -(best_neg + 1)
+
+    @njit(cache=True)
+    def _nb_search(pos, neg, occ_indptr, occ_indices, assumptions):
         """
-        Removes clauses containing 'literal' and removes '-literal' from others.
-        Does NOT modify the list in-place (returns new list).
+        Iterative DPLL over bitmask clauses with an explicit decision stack
+        and a unit-clause worklist fed by the occurrence lists.
+        Returns: (sat: 0/1, assign: int8[n_vars] with -1 = free, steps, backtracks)
         """
-        new_clauses = []
-        for c in clauses:
-            if literal in c:
-                continue # Clause satisfied
-            if -literal in c:
-                # Remove negated literal
-                new_c = [l for l in c if l != -literal]
-                new_clauses.append(new_c)
-            else:
-                new_clauses.append(c)
-        return new_clauses
+        n_clauses, n_words = pos.shape
+        n_vars = n_words * _WORD_BITS
+
+        active = pos | neg
+        satisfied = np.zeros(n_clauses, np.bool_)
+        assign = np.full(n_vars, -1, np.int8)
+
+        # Worklist of pending unit clauses. Along any one search path a
+        # clause crosses "one active literal left" at most once per
+        # removed occurrence, so 4*C + |assumptions| can never overflow.
+        units = np.empty(4 * n_clauses + assumptions.shape[0] + 8, np.int64)
+        head = 0
+        tail = 0
+        n_sat = 0
+        conflict = False
+
+        for i in range(assumptions.shape[0]):
+            tail, n_sat, cfl = _nb_assign(pos, neg, active, satisfied, assign,
+                                          occ_indptr, occ_indices,
+                                          assumptions[i], units, tail, n_sat)
+            conflict = conflict or cfl
+
+        # Seed with unit/empty clauses already present in the base formula
+        for c in range(n_clauses):
+            if satisfied[c]:
+                continue
+            cnt = _nb_clause_count(active, c)
+            if cnt == 0:
+                conflict = True
+            elif cnt == 1:
+                units[tail] = c
+                tail += 1
+
+        max_depth = n_vars + 1
+        saved_active = np.empty((max_depth, n_clauses, n_words), np.uint64)
+        saved_satisfied = np.empty((max_depth, n_clauses), np.bool_)
+        saved_assign = np.empty((max_depth, n_vars), np.int8)
+        saved_n_sat = np.zeros(max_depth, np.int64)
+        decision = np.zeros(max_depth, np.int64)
+        tried_other = np.zeros(max_depth, np.bool_)
+
+        depth = 0
+        steps = 0
+        backtracks = 0
+
+        while True:
+            steps += 1
+
+            # Drain the unit queue (clauses may have been satisfied or
+            # emptied since they were queued — re-check at pop time)
+            while head < tail and not conflict:
+                c = units[head]
+                head += 1
+                if satisfied[c]:
+                    continue
+                lit = _nb_clause_literal(pos, active, c)
+                if lit == 0:
+                    conflict = True
+                    break
+                tail, n_sat, cfl = _nb_assign(pos, neg, active, satisfied, assign,
+                                              occ_indptr, occ_indices,
+                                              lit, units, tail, n_sat)
+                conflict = conflict or cfl
+
+            if conflict:
+                # Backtrack past decisions whose second branch is exhausted
+                while depth > 0 and tried_other[depth - 1]:
+                    depth -= 1
+                if depth == 0:
+                    return 0, assign, steps, backtracks
+                depth -= 1
+                backtracks += 1
+                active[:, :] = saved_active[depth]
+                satisfied[:] = saved_satisfied[depth]
+                assign[:] = saved_assign[depth]
+                n_sat = saved_n_sat[depth]
+                tried_other[depth] = True
+                head = 0
+                tail = 0
+                conflict = False
+                tail, n_sat, cfl = _nb_assign(pos, neg, active, satisfied, assign,
+                                              occ_indptr, occ_indices,
+                                              -decision[depth], units, tail, n_sat)
+                conflict = cfl
+                continue
+
+            if n_sat == n_clauses:
+                return 1, assign, steps, backtracks
+
+            # Branch (DLIS)
+            lit = _nb_choose(pos, neg, active, satisfied, n_vars)
+            saved_active[depth] = active
+            saved_satisfied[depth] = satisfied
+            saved_assign[depth] = assign
+            saved_n_sat[depth] = n_sat
+            decision[depth] = lit
+            tried_other[depth] = False
+            depth += 1
+            head = 0
+            tail = 0
+            tail, n_sat, cfl = _nb_assign(pos, neg, active, satisfied, assign,
+                                          occ_indptr, occ_indices,
+                                          lit, units, tail, n_sat)
+            conflict = cfl
@@ -2,6 +2,22 @@ import torch
 import torch.nn as nn
 import torch.nn.functional as F
 
+def maybe_compile(model):
+    """
+    Wraps the model with torch.compile (dynamic shapes, since graph size
+    varies per dataset) so the per-layer message/update kernels get fused.
+    Returns the eager model unchanged on torch versions without compile
+    support. The wrapper shares parameters with the original module, so
+    saving the ORIGINAL model's state_dict keeps checkpoint keys clean.
+    """
+    if not hasattr(torch, 'compile'):
+        return model
+    try:
+        return torch.compile(model, dynamic=True)
+    except Exception as e:
+        print(f"torch.compile unavailable ({e}); running eager")
+        return model
+
 class BackboneMPNN(nn.Module):
     """
     Message Passing Neural Network for SAT Backbone Prediction.
@@ -46,91 +62,69 @@ class BackboneMPNN(nn.Module):
             nn.Linear(hidden_dim, 1) # Logit
         )
 
-    def forward(self, n_vars, clauses, device='cpu'):
+    def forward(self, n_vars, num_clauses, v_tensor, c_tensor, s_tensor, return_logits=False):
         """
         Args:
-            n_vars: int
-            clauses: list of lists (literals)
+            n_vars: total number of variable nodes (node ids 0..n_vars-1)
+            num_clauses: total number of clause nodes (ids n_vars..n_vars+num_clauses-1)
+            v_tensor: [E] long tensor, variable endpoint of each edge
+            c_tensor: [E] long tensor, clause endpoint of each edge
+            s_tensor: [E, 1] float tensor, literal sign per edge
+            return_logits: skip the sigmoid and return raw logits (for
+                BCEWithLogitsLoss under mixed precision)
+
+        The graph may be a single instance or a block-diagonal batch of
+        many instances (see collate in train_gnn.py) — message passing
+        never crosses disjoint components, so batching just means one big
+        edge list with all variable nodes packed before all clause nodes.
         """
-        # 1. Build Batch Data
-        # We process one graph at a time for research clarity (batching graphs is complex without torch_geometric)
-        
-        # Nodes: 0..N-1 (Vars), N..N+M-1 (Clauses)
-        num_clauses = len(clauses)
-        num_nodes = n_vars + num_clauses
-        
-        # Initial Embeddings
-        # Vars=0, Clauses=1
-        node_types = torch.zeros(num_nodes, dtype=torch.long, device=device)
-        node_types[n_vars:] = 1 
-        
-        h = self.type_embed(node_types) # [NumNodes, Hidden]
-        
-        # Build Edge Indices for MP
-        # We need two sets: V->C and C->V
-        v_indices = []
-        c_indices = []
-        signs = []
-        
-        for c_idx, clause in enumerate(clauses):
-            c_node = n_vars + c_idx
-            for lit in clause:
-                v_node = abs(lit) - 1 # 0-indexed
-                sign = 1.0 if lit > 0 else -1.0
-                
-                v_indices.append(v_node)
-                c_indices.append(c_node)
-                signs.append(sign)
-                
-        v_tensor = torch.tensor(v_indices, dtype=torch.long, device=device)
-        c_tensor = torch.tensor(c_indices, dtype=torch.long, device=device)
-        s_tensor = torch.tensor(signs, dtype=torch.float, device=device).unsqueeze(1) # [E, 1]
-        
+        device = v_tensor.device
+
+        # Keep variable and clause states as SEPARATE tensors: rebinding
+        # one partition each phase replaces the old torch.cat([...]) copy
+        # of the full node-state tensor (and the autograd graph stays
+        # clean because we never modify a needed tensor in-place).
+        # Clause indices are shifted to be local to the clause partition.
+        c_local = c_tensor - n_vars
+
+        h_vars = self.type_embed(torch.zeros(n_vars, dtype=torch.long, device=device))
+        h_clauses = self.type_embed(torch.ones(num_clauses, dtype=torch.long, device=device))
+
         # Message Passing Loop
         for _ in range(self.num_layers):
             # 1. Var -> Clause Phase
-            h_v = h[v_tensor]
-            h_c_target = h[c_tensor]
-            
+            h_v = h_vars[v_tensor]
+            h_c_target = h_clauses[c_local]
+
             msg_in = torch.cat([h_v, h_c_target, s_tensor], dim=1)
             messages = self.msg_v2c(msg_in)
-            
+
             # Aggregate to Clauses
-            # Use index_add (out-of-place) or index_add_ on a FRESH zero tensor
-            agg_to_c = torch.zeros(num_nodes, self.hidden_dim, device=device)
-            agg_to_c.index_add_(0, c_tensor, messages)
-            
-            h_clauses_old = h[n_vars:]
-            update_input = agg_to_c[n_vars:]
-            h_clauses_new = self.update_clause(update_input, h_clauses_old)
-            
-            # Create NEW h tensor to avoid inplace modification of the old one which is needed for gradient
-            # We can't just do h[n_vars:] = ... because h is a leaf or intermediate variable needed.
-            # We construct the new state from parts.
-            h_vars_current = h[:n_vars]
-            h = torch.cat([h_vars_current, h_clauses_new], dim=0)
-            
+            # Use index_add_ on a FRESH zero tensor
+            agg_to_c = torch.zeros(num_clauses, self.hidden_dim,
+                                   device=device, dtype=messages.dtype)
+            agg_to_c.index_add_(0, c_local, messages)
+
+            # .to() is a no-op in fp32; under autocast it keeps the GRU
+            # hidden state in the same (reduced) dtype as the messages
+            h_clauses = self.update_clause(agg_to_c, h_clauses.to(agg_to_c.dtype))
+
             # 2. Clause -> Var Phase
-            # Now h has updated clauses
-            h_c = h[c_tensor]
-            h_v_target = h[v_tensor]
-            
+            # Now h_clauses is the updated state
+            h_c = h_clauses[c_local]
+            h_v_target = h_vars[v_tensor]
+
             msg_in = torch.cat([h_c, h_v_target, s_tensor], dim=1)
             messages = self.msg_c2v(msg_in)
-            
-            agg_to_v = torch.zeros(num_nodes, self.hidden_dim, device=device)
+
+            agg_to_v = torch.zeros(n_vars, self.hidden_dim,
+                                   device=device, dtype=messages.dtype)
             agg_to_v.index_add_(0, v_tensor, messages)
-            
-            h_vars_old = h[:n_vars]
-            update_input = agg_to_v[:n_vars]
-            h_vars_new = self.update_var(update_input, h_vars_old)
-            
-            h_clauses_current = h[n_vars:]
-            h = torch.cat([h_vars_new, h_clauses_current], dim=0)
+
+            h_vars = self.update_var(agg_to_v, h_vars.to(agg_to_v.dtype))
 
         # Final Prediction
-        h_vars = h[:n_vars]
-        logits = self.projection_head(h_vars) # [N, 1]
-        probs = torch.sigmoid(logits).squeeze(1)
-        
-        return probs
+        logits = self.projection_head(h_vars).squeeze(1) # [N]
+        if return_logits:
+            return logits
+        return torch.sigmoid(logits)
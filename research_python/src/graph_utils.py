@@ -1,68 +1,98 @@
 import networkx as nx
 import numpy as np
+from scipy import sparse
+
+from .sat_generator import SatGenerator
+
+def build_vc_adjacency(clauses, n_vars):
+    """
+    Builds the Variable-Clause (VC) adjacency matrix directly as a SciPy
+    sparse matrix (no intermediate NetworkX graph).
+    Rows/Cols:
+      - Variable Nodes: 0..N-1
+      - Clause Nodes: N..N+M-1
+    An edge (v, c) exists if var v (either polarity) appears in clause c.
+
+    Returns: symmetric CSR matrix of shape [N+M, N+M]
+    """
+    num_clauses = len(clauses)
+    num_nodes = n_vars + num_clauses
+
+    rows, c_idx, _ = SatGenerator.to_edge_arrays(clauses)
+    cols = n_vars + c_idx
+
+    data = np.ones(len(rows), dtype=np.float64)
+    upper = sparse.coo_matrix((data, (rows, cols)), shape=(num_nodes, num_nodes))
+    adjacency = (upper + upper.T).tocsr()
+    # Duplicate (v, c) entries (same var twice in a clause) would sum; clip back to 0/1
+    adjacency.data[:] = 1.0
+    return adjacency
 
 def build_vc_graph(clauses, n_vars):
     """
-    Builds a Variable-Clause (VC) Graph (Bipartite).
-    Nodes: 
+    Builds a Variable-Clause (VC) Graph (Bipartite) as a NetworkX Graph,
+    with literal signs on the edges (Signed Graph). Kept for
+    inspection/visualization; the spectrum pipeline below works on the
+    sparse adjacency from build_vc_adjacency instead.
+    Nodes:
       - Variable Nodes: 1..N
       - Clause Nodes: N+1..N+M
-    Edges:
-      - If var v is in clause c: Edge (v, c) with weight +1
-      - If -v is in clause c: Edge (v, c) with weight -1 (Signed Graph)
-      
-    Returns: NetworkX Graph
     """
     G = nx.Graph()
-    
+
     # Add variable nodes
     for i in range(1, n_vars + 1):
         G.add_node(i, type='variable')
-        
+
     num_clauses = len(clauses)
     clause_start_idx = n_vars + 1
-    
+
     # Add clause nodes and edges
     for idx, clause in enumerate(clauses):
         c_node_id = clause_start_idx + idx
         G.add_node(c_node_id, type='clause')
-        
+
         for lit in clause:
             var = abs(lit)
-            # sign = 1 if lit > 0 else -1
-            # For simple Laplacian, we use unweighted initially.
-            # Sign can be stored in edge attribute
             sign = 1 if lit > 0 else -1
             G.add_edge(var, c_node_id, sign=sign)
-            
+
     return G
 
-def get_laplacian_spectrum(G, num_eigenvalues=5):
+def get_laplacian_spectrum(adjacency, num_eigenvalues=5):
     """
     Computes the smallest non-zero eigenvalues of the Normalized Laplacian.
     These are the "Fiedler Values" related to graph connectivity and partitioning.
+
+    Args:
+        adjacency: sparse adjacency matrix from build_vc_adjacency.
     """
-    # Get Normalized Laplacian
+    # Normalized Laplacian built directly from the sparse adjacency:
     # L = I - D^-1/2 A D^-1/2
     try:
-        L = nx.normalized_laplacian_matrix(G)
-        
+        degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+        with np.errstate(divide='ignore'):
+            d_inv_sqrt = 1.0 / np.sqrt(degrees)
+        d_inv_sqrt[~np.isfinite(d_inv_sqrt)] = 0.0 # isolated nodes
+
+        D_inv_sqrt = sparse.diags(d_inv_sqrt)
+        L = sparse.identity(adjacency.shape[0], format='csr') - D_inv_sqrt @ adjacency @ D_inv_sqrt
+
         # Scipy Sparse Eigsh to get smallest real eigenvalues
-        # sigma=0 finds eigenvalues near 0
         from scipy.sparse.linalg import eigsh
-        
-        # k must be < N. G has N+M nodes.
+
+        # k must be < N. The graph has N+M nodes.
         k = min(num_eigenvalues + 1, L.shape[0] - 1)
-        
+
         # 'SM' = Smallest Magnitude
         evals, _ = eigsh(L, k=k, which='SM')
-        
+
         # Sort and remove the trivial zero (or near-zero)
         evals = sorted(evals)
-        
-        # Usually first one is 0. 
+
+        # Usually first one is 0.
         return evals[1:] # Return top k non-zero
-        
+
     except Exception as e:
         print(f"Error checking spectrum: {e}")
         return []
@@ -1,4 +1,3 @@
-import random
 import numpy as np
 
 class SatGenerator:
@@ -19,19 +18,50 @@ class SatGenerator:
             where clauses is a list of lists of integers (literals).
         """
         n_clauses = int(round(n_vars * alpha))
-        clauses = []
-        
-        for _ in range(n_clauses):
-            # Pick 3 distinct variables from 1 to n_vars
-            # We use 1-based indexing for standard DIMACS format compatibility logic
-            vars_idx = random.sample(range(1, n_vars + 1), 3)
-            
-            # Randomly negate with 0.5 probability
-            clause = [v if random.random() > 0.5 else -v for v in vars_idx]
-            clauses.append(clause)
-            
+
+        # Vectorized sampling: 3 distinct variables per clause come from
+        # argpartition over one random matrix (row-wise "sample without
+        # replacement"), signs from one Bernoulli draw. One-based variable
+        # indexing for standard DIMACS format compatibility logic.
+        ranks = np.random.rand(n_clauses, n_vars)
+        vars_idx = np.argpartition(ranks, 2, axis=1)[:, :3] + 1
+
+        # Randomly negate with 0.5 probability
+        signs = np.where(np.random.rand(n_clauses, 3) > 0.5, 1, -1)
+        clauses = (vars_idx * signs).tolist()
+
         return clauses, n_vars
 
+    @staticmethod
+    def to_edge_arrays(clauses):
+        """
+        Converts clauses to SoA (structure-of-arrays) edge form for the
+        bipartite Variable-Clause graph: three parallel numpy arrays, one
+        entry per literal occurrence.
+
+        Returns:
+            tuple: (v_idx, c_idx, sign)
+            v_idx (int64): 0-based variable index per literal
+            c_idx (int64): clause index per literal
+            sign (int64): +1 / -1 per literal
+        """
+        lengths = {len(c) for c in clauses}
+        if len(lengths) == 1:
+            # Uniform k-SAT (the generated case): one reshape, no Python loop
+            lits = np.asarray(clauses, dtype=np.int64)
+            flat = lits.ravel()
+            c_idx = np.repeat(np.arange(len(clauses), dtype=np.int64), lits.shape[1])
+        else:
+            # Ragged clause lengths (e.g. after manual edits)
+            counts = np.fromiter((len(c) for c in clauses), dtype=np.int64, count=len(clauses))
+            flat = np.fromiter((lit for c in clauses for lit in c),
+                               dtype=np.int64, count=int(counts.sum()))
+            c_idx = np.repeat(np.arange(len(clauses), dtype=np.int64), counts)
+
+        v_idx = np.abs(flat) - 1
+        sign = np.sign(flat)
+        return v_idx, c_idx, sign
+
     @staticmethod
     def to_dimacs(clauses, n_vars):
         """
@@ -1,21 +1,36 @@
 import torch
 import torch.nn as nn
 import torch.optim as optim
-import json
+import os
 import numpy as np
-from src.gnn_model import BackboneMPNN
+from src.gnn_model import BackboneMPNN, maybe_compile
+from src.sat_generator import SatGenerator
+from src.dataset_io import load_dataset
+
+def _to_device(tensor, device):
+    """
+    Moves a CPU tensor to the compute device. For CUDA targets the tensor
+    is staged through pinned (page-locked) memory first, so the copy is an
+    async DMA transfer (non_blocking) instead of a blocking pageable one.
+    """
+    if device.type == 'cuda':
+        return tensor.pin_memory().to(device, non_blocking=True)
+    return tensor.to(device)
+
+def load_data(path):
+    """
+    Loads a dataset into per-sample CPU tensors. Device placement happens
+    once per batch in collate (pinned + async for CUDA), not per sample.
+    """
+    data = load_dataset(path)
 
-def load_data(path, device):
-    with open(path, 'r') as f:
-        data = json.load(f)
-    
     samples = []
     for d in data:
         n_vars = d['n_vars']
         clauses = d['clauses']
         backbone = d['backbone'] # dict "1": true/false
         backbone_set = set(str(k) for k in backbone.keys())
-        
+
         # Label: 1 if Frozen (in backbone), 0 if Free
         labels = []
         for v in range(1, n_vars + 1):
@@ -23,69 +38,112 @@ def load_data(path, device):
                 labels.append(1.0)
             else:
                 labels.append(0.0)
-                
-        labels_tensor = torch.tensor(labels, dtype=torch.float, device=device)
-        samples.append((n_vars, clauses, labels_tensor))
-        
+
+        labels_tensor = torch.tensor(labels, dtype=torch.float)
+
+        # Precompute edge tensors ONCE here; the graph structure is
+        # static, so rebuilding these lists every forward pass (epochs x
+        # samples times) was pure waste. Indices are sample-local:
+        # vars 0..n_vars-1, clauses 0..num_clauses-1 (collate adds offsets).
+        v_idx, c_idx, sign = SatGenerator.to_edge_arrays(clauses)
+
+        v_tensor = torch.from_numpy(v_idx)
+        c_tensor = torch.from_numpy(c_idx)
+        s_tensor = torch.from_numpy(sign.astype(np.float32)).unsqueeze(1) # [E, 1]
+
+        samples.append((n_vars, len(clauses), v_tensor, c_tensor, s_tensor, labels_tensor))
+
     return samples
 
+def collate(samples, device):
+    """
+    Packs a list of precomputed samples (from load_data) into ONE
+    block-diagonal bipartite graph so an epoch is a single forward pass.
+
+    All variable nodes come first (ids 0..total_vars-1), then all clause
+    nodes, each sample getting a contiguous range of both. Disjoint
+    components never exchange messages, so this is equivalent to running
+    the samples one by one.
+
+    Returns: (total_vars, total_clauses, v_tensor, c_tensor, s_tensor, labels)
+    """
+    total_vars = sum(s[0] for s in samples)
+
+    v_parts = []
+    c_parts = []
+    s_parts = []
+    label_parts = []
+
+    var_offset = 0
+    clause_offset = 0
+    for n_vars, num_clauses, v_tensor, c_tensor, s_tensor, labels_tensor in samples:
+        v_parts.append(v_tensor + var_offset)
+        c_parts.append(c_tensor + (total_vars + clause_offset))
+        s_parts.append(s_tensor)
+        label_parts.append(labels_tensor)
+        var_offset += n_vars
+        clause_offset += num_clauses
+
+    v_tensor = _to_device(torch.cat(v_parts), device)
+    c_tensor = _to_device(torch.cat(c_parts), device)
+    s_tensor = _to_device(torch.cat(s_parts), device)
+    labels = _to_device(torch.cat(label_parts), device)
+
+    return total_vars, clause_offset, v_tensor, c_tensor, s_tensor, labels
+
 def train():
     device = torch.device('cpu') # GNN is small, CPU is fine
     print(f"Training on {device}...")
-    
-    train_data = load_data('data/dataset_small.json', device)
-    
+
+    dataset_path = 'data/dataset_small.npz'
+    if not os.path.exists(dataset_path):
+        dataset_path = 'data/dataset_small.json' # legacy format
+    train_data = load_data(dataset_path)
+
     # Split
     split_idx = int(0.8 * len(train_data))
     train_set = train_data[:split_idx]
     val_set = train_data[split_idx:]
-    
+
     print(f"Train: {len(train_set)}, Val: {len(val_set)}")
-    
+
+    # Collate ONCE: every epoch is then a single batched forward/backward
+    # instead of one launch per tiny graph.
+    n_vars, n_clauses, v_tensor, c_tensor, s_tensor, labels = collate(train_set, device)
+    val_n_vars, val_n_clauses, val_v, val_c, val_s, val_labels = collate(val_set, device)
+
     model = BackboneMPNN(hidden_dim=32, num_layers=4).to(device)
+    run_model = maybe_compile(model) # fused kernels; shares model's parameters
     optimizer = optim.Adam(model.parameters(), lr=0.005)
     criterion = nn.BCELoss()
-    
+
     epochs = 20
-    
+
     for epoch in range(epochs):
         model.train()
-        total_loss = 0
-        
-        for n_vars, clauses, labels in train_set:
-            optimizer.zero_grad()
-            preds = model(n_vars, clauses, device)
-            loss = criterion(preds, labels)
-            loss.backward()
-            optimizer.step()
-            total_loss += loss.item()
-            
-        avg_loss = total_loss / len(train_set)
-        
+        optimizer.zero_grad()
+        preds = run_model(n_vars, n_clauses, v_tensor, c_tensor, s_tensor)
+        loss = criterion(preds, labels)
+        loss.backward()
+        optimizer.step()
+        avg_loss = loss.item()
+
         # Validation
         model.eval()
-        val_acc = 0
-        total_valid_nodes = 0
-        correct_frozen = 0
-        total_frozen = 0
-        
         with torch.no_grad():
-            for n_vars, clauses, labels in val_set:
-                preds = model(n_vars, clauses, device)
-                binary_preds = (preds > 0.5).float()
-                
-                correct = (binary_preds == labels).sum().item()
-                val_acc += correct
-                total_valid_nodes += n_vars
-                
-                frozen_mask = (labels == 1.0)
-                frozen_correct = (binary_preds[frozen_mask] == 1.0).sum().item()
-                correct_frozen += frozen_correct
-                total_frozen += frozen_mask.sum().item()
+            preds = run_model(val_n_vars, val_n_clauses, val_v, val_c, val_s)
+            binary_preds = (preds > 0.5).float()
+
+            val_acc = (binary_preds == val_labels).sum().item()
+            total_valid_nodes = val_n_vars
+
+            frozen_mask = (val_labels == 1.0)
+            correct_frozen = (binary_preds[frozen_mask] == 1.0).sum().item()
+            total_frozen = frozen_mask.sum().item()
 
         epoch_acc = val_acc / total_valid_nodes if total_valid_nodes > 0 else 0
         frozen_recall = correct_frozen / total_frozen if total_frozen > 0 else 0
-        
+
         print(f"Epoch {epoch+1:02d} | Loss: {avg_loss:.4f} | Acc: {epoch_acc*100:.1f}% | Backbone Recall: {frozen_recall*100:.1f}%")
 
     # Save model